@@ -9,7 +9,7 @@ import nox
 def format(session):
     """Run black code formatter."""
     session.install("black==21.12b0", "isort==5.10.1")
-    files = ["wintertools", "noxfile.py"]
+    files = ["wintertools", "tests", "noxfile.py"]
     session.run("black", *files)
     session.run("isort", *files)
 
@@ -19,5 +19,11 @@ def lint(session):
     session.install(
         "flake8==4.0.1", "flake8-bugbear==21.11.29", "flake8-comprehensions==3.7.0"
     )
-    files = ["wintertools", "noxfile.py"]
+    files = ["wintertools", "tests", "noxfile.py"]
     session.run("flake8", *files)
+
+
+@nox.session(reuse_venv=True)
+def test(session):
+    session.install("pytest", ".")
+    session.run("pytest", "tests", *session.posargs)
@@ -0,0 +1,77 @@
+# Copyright (c) 2024 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+import math
+
+from wintertools.reportcard import graph, report
+
+
+def _failing_report():
+    r = report.Report(name="test")
+    section = report.Section(name="section")
+    section.append(report.TextItem(text="hello"))
+    section.append(report.PassFailItem(label="voltage", value=False))
+    r.append(section)
+    return r
+
+
+def test_json_round_trip():
+    r = _failing_report()
+
+    loaded = report.Report.parse_raw(r.json())
+
+    assert isinstance(loaded.sections[0].items[1], report.PassFailItem)
+    assert not loaded.succeeded
+
+
+def test_json_with_options_keeps_class_tags():
+    r = _failing_report()
+
+    loaded = report.Report.parse_raw(r.json(exclude_none=True))
+
+    assert isinstance(loaded.sections[0].items[0], report.TextItem)
+    assert isinstance(loaded.sections[0].items[1], report.PassFailItem)
+    assert not loaded.succeeded
+
+
+def test_json_with_options_applies_them():
+    r = _failing_report()
+
+    raw = r.json(exclude={"ulid"})
+
+    assert '"ulid"' not in raw
+    assert '"__class__": "PassFailItem"' in raw
+
+
+def test_dict_is_not_tagged():
+    r = _failing_report()
+
+    assert "__class__" not in r.dict()
+    r.json(exclude_none=True)
+    assert "__class__" not in r.dict()
+
+
+def test_save_and_load_non_finite_values(tmp_path):
+    r = report.Report(name="test")
+    section = report.Section(name="section")
+    data = [(0.0, 1.0), (1.0, float("nan")), (2.0, float("inf")), (3.0, 0.5)]
+    section.append(
+        report.LineGraphItem(
+            series=graph.Series(data=data),
+            graph=graph.LineGraph(outline=graph.Outline(left=None)),
+        )
+    )
+    r.append(section)
+
+    path = tmp_path / "report.json"
+    r.save(path)
+    loaded = report.Report.load(path)
+
+    item = loaded.sections[0].items[0]
+    assert item.graph.outline.left is None
+    loaded_data = item.series.data
+    assert loaded_data[0] == (0.0, 1.0)
+    assert math.isnan(loaded_data[1][1])
+    assert loaded_data[2] == (2.0, float("inf"))
+    assert loaded_data[3] == (3.0, 0.5)
@@ -0,0 +1,52 @@
+# Copyright (c) 2024 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from wintertools import waveform
+
+
+def _waveform(num_samples=500):
+    time = np.linspace(0, 1e-3, num_samples)
+    voltage = 5 * np.sin(2 * np.pi * 3e3 * time)
+    voltage += np.random.default_rng(0).normal(0, 0.2, num_samples)
+    return waveform.Waveform(
+        vertical_resolution=256,
+        vertical_division=1.0,
+        vertical_offset=0.0,
+        vertical_max=6.0,
+        vertical_min=-6.0,
+        time_division=1e-4,
+        trigger_offset=0.0,
+        sample_rate=num_samples / 1e-3,
+        sample_step=1,
+        frequency=3e3,
+        time=time,
+        voltage=voltage,
+    )
+
+
+@pytest.mark.parametrize("thickness", [1, 3, 5, 10, 50])
+def test_to_binary_image_matches_pillow(thickness):
+    wf = _waveform()
+    size = (wf.num_samples * 2, wf.vertical_resolution * 2)
+
+    expected = Image.new("1", size, color=0)
+    lines = waveform._map_series_to_image_coords(
+        series=wf.voltage,
+        src_min=wf.vertical_min,
+        src_max=wf.vertical_max,
+        dst_width=size[0],
+        dst_height=size[1],
+    )
+    ImageDraw.Draw(expected).line(
+        lines.flatten().tolist(), fill=1, width=thickness, joint="curve"
+    )
+
+    result = wf.to_binary_image(thickness=thickness)
+
+    assert result.size == expected.size
+    assert np.array_equal(np.asarray(result), np.asarray(expected))
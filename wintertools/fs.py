@@ -100,6 +100,21 @@ def copyfile(src, dst):
     flush(dst)
 
 
+def _is_up_to_date(src, dst):
+    # Compares stats only, reading files back from a slow drive costs about as
+    # much as copying them. FAT only stores mtimes to within two seconds.
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+
+    src_stat = os.stat(src)
+    return (
+        dst_stat.st_size == src_stat.st_size
+        and abs(dst_stat.st_mtime - src_stat.st_mtime) <= 2
+    )
+
+
 def deploy_files(srcs_and_dsts, destination):
     os.makedirs(os.path.join(destination, "lib"), exist_ok=True)
 
@@ -120,8 +135,14 @@ def deploy_files(srcs_and_dsts, destination):
             else:
                 # Destination is a directory, make sure it exists.
                 os.makedirs(full_dst, exist_ok=True)
+                full_dst = os.path.join(full_dst, os.path.basename(src))
+
+            if _is_up_to_date(src, full_dst):
+                print(f"{dst} is up to date")
+                continue
 
-            shutil.copy(src, full_dst)
+            # copy2 keeps the mtime so that the next deploy can skip the file.
+            shutil.copy2(src, full_dst)
 
         src = os.path.relpath(src, start=os.path.join(os.curdir, ".."))
         print(f"Copied {src} to {dst}")
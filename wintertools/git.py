@@ -52,10 +52,14 @@ def latest_tag():
     return tags()[0]
 
 
-def get_change_summary(start, end):
-    changes = run("git", "log", "--format=%s", f"{start}..{end}").split("\n")
-    list(filter(None, changes))
-    return changes
+def get_change_summary(start, end, max_count=None):
+    args = ["git", "log", "-z", "--format=%s"]
+
+    if max_count:
+        args.append(f"--max-count={max_count}")
+
+    changes = run(*args, f"{start}..{end}").split("\0")
+    return list(filter(None, changes))
 
 
 def tag(name, push=True):
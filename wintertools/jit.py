@@ -0,0 +1,29 @@
+# Copyright (c) 2024 Alethea Katherine Flowers.
+# Published under the standard MIT License.
+# Full text available at: https://opensource.org/licenses/MIT
+
+"""
+Optional numba kernels that are only compiled once they're needed.
+
+numba takes a while to import, so importing it at module scope would slow
+down every import of the modules that use it, even when no kernel runs.
+"""
+
+import functools
+
+
+def lazy_njit(func, *args, **kwargs):
+    """Returns a function that compiles func with numba.njit(*args, **kwargs)
+    the first time it's called and returns the compiled kernel from then on,
+    or None if numba isn't installed."""
+
+    @functools.cache
+    def get_kernel():
+        try:
+            import numba
+        except ImportError:
+            return None
+
+        return numba.njit(*args, **kwargs)(func)
+
+    return get_kernel
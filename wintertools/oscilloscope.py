@@ -151,7 +151,8 @@ class Oscilloscope(visa.Instrument):
             # Starts with b'DAT2,#9000000000' and ends with b'\n\n'
             points = response[16:-2][0:-1:step]
 
-            timeseries = np.zeros((len(points), 2), dtype=np.float64)
+            times = np.zeros(len(points), dtype=np.float64)
+            voltages = np.zeros(len(points), dtype=np.float64)
 
             for n, pt in enumerate(points):
                 if pt > 127:
@@ -160,7 +161,8 @@ class Oscilloscope(visa.Instrument):
                 voltage = pt / _VERT_GRID_LINES * vdiv - voffset
                 time = -(tdiv * _HORIZ_GRID_LINES / 2) + (n * step * (1 / sample_rate)) - trigdelay
 
-                timeseries[n] = [time, voltage]
+                times[n] = time
+                voltages[n] = voltage
 
             return Waveform(
                 vertical_resolution=256,
@@ -173,7 +175,8 @@ class Oscilloscope(visa.Instrument):
                 sample_rate=sample_rate,
                 sample_step=step,
                 frequency=freq,
-                data=timeseries
+                time=times,
+                voltage=voltages,
             )
 
         finally:
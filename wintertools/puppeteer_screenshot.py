@@ -5,17 +5,32 @@ import asyncio
 from pyppeteer import launch
 
 
+async def _capture_async(load, dst, width):
+    browser = await launch(args=["--no-sandbox"])
+    page = await browser.newPage()
+    await load(page)
+    await page.evaluateHandle("document.fonts.ready")
+    await page.setViewport({"width": width, "height": width * 2})
+    await page.screenshot({"path": dst, "fullPage": True})
+    await browser.close()
+
+
 def capture(url, dst, width=1000):
-    async def _cap_async():
-        browser = await launch(args=["--no-sandbox"])
-        page = await browser.newPage()
+    async def _load(page):
         await page.goto(url, {"waitUntil": "networkidle0"})
-        await page.evaluateHandle("document.fonts.ready")
-        await page.setViewport({"width": width, "height": width * 2})
-        await page.screenshot({"path": dst, "fullPage": True})
-        await browser.close()
 
-    asyncio.get_event_loop().run_until_complete(_cap_async())
+    asyncio.get_event_loop().run_until_complete(_capture_async(_load, dst, width))
+
+
+def capture_html(html, dst, width=1000):
+    """Like capture(), but loads the page from an HTML string instead of a
+    URL."""
+
+    async def _load(page):
+        await page.setContent(html)
+        await page.waitForFunction("document.readyState === 'complete'")
+
+    asyncio.get_event_loop().run_until_complete(_capture_async(_load, dst, width))
 
 
 if __name__ == "__main__":
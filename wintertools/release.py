@@ -8,7 +8,6 @@ import atexit
 import collections
 import datetime
 import importlib.util
-import mimetypes
 import os
 import os.path
 import shutil
@@ -20,8 +19,16 @@ import requests
 from wintertools import git
 
 GITHUB_API_TOKEN = os.environ["GITHUB_API_KEY"]
+MAX_CHANGES = int(os.environ.get("WINTERTOOLS_MAX_CHANGES", "0")) or None
 
-mimetypes.init()
+_CONTENT_TYPES = {
+    ".bin": "application/octet-stream",
+    ".elf": "application/octet-stream",
+    ".hex": "text/plain",
+    ".json": "application/json",
+    ".uf2": "application/octet-stream",
+    ".zip": "application/zip",
+}
 
 
 class _Artifacts:
@@ -56,7 +63,9 @@ def _git_info() -> dict:
     info["last_release"] = git.latest_tag()
 
     # List of commits/changes since last version
-    changes = git.get_change_summary(info["last_release"], "HEAD")
+    changes = git.get_change_summary(
+        info["last_release"], "HEAD", max_count=MAX_CHANGES
+    )
 
     # Arrange changes by category
     categorized_changes = collections.defaultdict(list)
@@ -106,22 +115,41 @@ def _create_release(session, git_info, description):
     return response.json()
 
 
+class _FileChunks:
+    """Streams a file in fixed-size chunks so that uploads never hold more
+    than one chunk in memory."""
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+
+    def __len__(self):
+        return os.path.getsize(self.path)
+
+    def __iter__(self):
+        with open(self.path, "rb") as fh:
+            while chunk := fh.read(self.CHUNK_SIZE):
+                yield chunk
+
+
 def _upload_release_artifact(session, release, artifact):
-    content_type, _ = mimetypes.guess_type(artifact["path"])
-
-    if not content_type:
-        content_type = "application/octet-string"
-
-    with open(artifact["path"], "rb") as fh:
-        response = session.post(
-            release["upload_url"].split("{", 1)[0],
-            params={
-                "name": artifact["name"],
-            },
-            headers={"Content-Type": content_type},
-            data=fh.read(),
-        )
-        response.raise_for_status()
+    extension = os.path.splitext(artifact["path"])[1].lower()
+    content_type = _CONTENT_TYPES.get(extension, "application/octet-stream")
+    size = os.path.getsize(artifact["path"])
+
+    # GitHub rejects chunked uploads, so the length is always given. requests
+    # still marks an empty stream as chunked, so empty files are sent as an
+    # empty body instead.
+    response = session.post(
+        release["upload_url"].split("{", 1)[0],
+        params={
+            "name": artifact["name"],
+        },
+        headers={"Content-Type": content_type, "Content-Length": str(size)},
+        data=_FileChunks(artifact["path"]) if size else b"",
+    )
+    response.raise_for_status()
 
 
 def add_artifact(src, name, **details):
@@ -43,9 +43,8 @@ if __name__ == "__main__":
     if args.html:
         render.render_html(report, args.html)
 
-    if args.image:
-        render.render_image(report, args.image)
+    if args.image or args.print:
+        dest = render.render_image(report, args.image)
 
     if args.print:
-        dest = render.render_image(report, args.image)
         thermalprinter.print_me_maybe(dest)
@@ -6,18 +6,26 @@ import colorsys
 import math
 from typing import Callable, Sequence, Union
 
+import numpy as np
 import pydantic
 import rich.align
 import rich.box
 import rich.table
 import rich.text
 
+from wintertools.jit import lazy_njit
 from wintertools.units import format_hertz, format_volts
 from wintertools.waveform import Waveform
 
 from .svg import Drawing
 
 
+def _num(val):
+    """Formats a path coordinate with at most one decimal place, dropping it
+    entirely for whole numbers."""
+    return f"{val:.1f}".removesuffix(".0")
+
+
 def _text(dwg, x, y, content, class_=""):
     lg = dwg.g()
     lg.translate(x, y)
@@ -64,6 +72,21 @@ class Axis(pydantic.BaseModel):
         norm = (val - self.min) / self.span
         return self.ease(norm)
 
+    def offsets_of(self, vals):
+        """offset_of() for an array of values."""
+        return self.ease_all((vals - self.min) / self.span)
+
+    def ease_all(self, norms):
+        """Applies ease to an array of values. Custom ease functions may only
+        handle scalars, so they're called once per value."""
+        if self.ease in _ARRAY_EASES:
+            return self.ease(norms)
+        return np.fromiter(map(self.ease, norms.tolist()), np.float64, norms.size)
+
+
+# Ease functions that also work on whole arrays.
+_ARRAY_EASES = (Ease.linear, Ease.quad, Ease.cube, Ease.quart)
+
 
 class Padding(pydantic.BaseModel):
     left: float = 0
@@ -99,38 +122,31 @@ class GridLines(pydantic.BaseModel):
     y_step: float | None = None
 
     def draw(self, dwg, x_axis, y_axis, w, h):
-        px = dwg.path(class_="x-axis grid-lines")
-        px.fill(color="none")
-        px.stroke(color="gray", width=1)
-        py = dwg.path(class_="y-axis grid-lines")
-        py.fill(color="none")
-        py.stroke(color="gray", width=1)
+        x_step = self.x_step if self.x_step is not None else 0.1
+        y_step = self.y_step if self.y_step is not None else 0.1
 
         # Vertical lines
-        if self.x_step is None:
-            self.x_step = 0.1
-
         x_center = x_axis.offset_of(0)
-        x_min_step = -math.floor(x_center / self.x_step)
-        x_max_step = math.ceil((1 - x_center) / self.x_step)
-
-        for step in range(x_min_step, x_max_step):
-            x = x_center + (step * self.x_step)
-            px.push("M", x_axis.ease(x) * w, 0)
-            px.push("l", 0, h)
+        x_steps = np.arange(
+            -math.floor(x_center / x_step), math.ceil((1 - x_center) / x_step)
+        )
+        xs = x_axis.ease_all(x_center + x_steps * x_step) * w
+        x_commands = [f"M{_num(x)},0 v{_num(h)}" for x in xs.tolist()]
 
         # Horizontal lines
-        if self.y_step is None:
-            self.y_step = 0.1
-
         y_center = y_axis.offset_of(0)
-        y_min_step = -math.floor(y_center / self.y_step)
-        y_max_step = math.ceil((1 - y_center) / self.y_step)
+        y_steps = np.arange(
+            -math.floor(y_center / y_step), math.ceil((1 - y_center) / y_step)
+        )
+        ys = h - y_axis.ease_all(y_center + y_steps * y_step) * h
+        y_commands = [f"M0,{_num(y)} h{_num(w)}" for y in ys.tolist()]
 
-        for step in range(y_min_step, y_max_step):
-            y = y_center + (step * self.y_step)
-            py.push("M", 0, h - y_axis.ease(y) * h)
-            py.push("l", w, 0)
+        px = dwg.path(d=" ".join(x_commands), class_="x-axis grid-lines")
+        px.fill(color="none")
+        px.stroke(color="gray", width=1)
+        py = dwg.path(d=" ".join(y_commands), class_="y-axis grid-lines")
+        py.fill(color="none")
+        py.stroke(color="gray", width=1)
 
         return [px, py]
 
@@ -175,7 +191,6 @@ class LineGraph(pydantic.BaseModel):
         drawing.add_builtin_stylesheet("graph.css")
         svg = drawing.svg
         x, y, w, h = self.padding(0, 0, drawing.width, drawing.height)
-        h_half = h * 0.5
 
         clip_path = svg.defs.add(svg.clipPath(id="clipBounds"))
         clip_path.add(svg.rect(insert=(x, y), size=(w, h)))
@@ -186,14 +201,12 @@ class LineGraph(pydantic.BaseModel):
 
         # middle line
         if self.center_line is not False:
-            p = svg.path()
+            center_y = self.y_axis.offset_of(0)
+            center_y = h - (center_y * h)
+            p = svg.path(d=f"M0,{_num(center_y)} H{_num(w)}")
             p.fill(color="none")
             p.stroke(color="black", width=2)
             # p.dasharray([4])
-            center_y = self.y_axis.offset_of(0)
-            center_y = h - (center_y * h)
-            p.push("M", 0, center_y)
-            p.push("L", w, center_y)
             g.add(p)
 
         # gridlines
@@ -213,63 +226,62 @@ class LineGraph(pydantic.BaseModel):
 
         # start of data points
         for series in serieses:
-            p = svg.path()
+            if not series.data:
+                continue
+
+            # datapoints, projected all at once. The coordinate pairs after the
+            # initial moveto are implicit linetos.
+            x_offsets, y_offsets = _decimate(
+                *_project(
+                    np.asarray(series.data, dtype=np.float64),
+                    self.x_axis,
+                    self.y_axis,
+                    w,
+                    h,
+                )
+            )
+
+            points = [
+                f"{_num(x)},{_num(y)}"
+                for x, y in zip(x_offsets.tolist(), y_offsets.tolist())
+            ]
+
+            p = svg.path(d="M" + " ".join(points))
             p.fill(color="none")
             p.stroke(color=series.stroke, width=series.stroke_width)
-            p.push("M", 0, h_half)
-
-            # datapoints
-            for n, (x, y) in enumerate(series.data):
-                x_offset_factor = self.x_axis.offset_of(x)
-                x_offset_factor = min(1.0, max(0.0, x_offset_factor))
-                x_offset = x_offset_factor * w
-
-                y_offset_factor = self.y_axis.offset_of(y)
-                y_offset_factor = min(1.0, max(0.0, y_offset_factor))
-                y_offset = h - (y_offset_factor * h)
-
-                p.push("M" if n == 0 else "L", x_offset, y_offset)
-
             g2.add(p)
 
-        # outlines
-        if self.outline.left is not None:
-            p = svg.path()
-            p.fill(color="none")
-            p.stroke(color="black", width=self.outline.left)
-            p.push("M", 0, 0)
-            p.push("l", 0, h)
-            g.add(p)
-        if self.outline.bottom is not None:
-            p = svg.path()
-            p.fill(color="none")
-            p.stroke(color="black", width=self.outline.bottom)
-            p.push("M", 0, h)
-            p.push("l", w, 0)
-            g.add(p)
-        if self.outline.right is not None:
-            p = svg.path()
-            p.fill(color="none")
-            p.stroke(color="black", width=self.outline.right)
-            p.push("M", w, 0)
-            p.push("l", 0, h)
-            g.add(p)
-        if self.outline.top is not None:
-            p = svg.path()
+        # outlines, sides that share a width are drawn as a single path.
+        outline_sides = (
+            (self.outline.left, f"M0,0 v{_num(h)}"),
+            (self.outline.bottom, f"M0,{_num(h)} h{_num(w)}"),
+            (self.outline.right, f"M{_num(w)},0 v{_num(h)}"),
+            (self.outline.top, f"M0,0 h{_num(w)}"),
+        )
+        outlines = {}
+        for width, command in outline_sides:
+            if width is not None:
+                outlines.setdefault(width, []).append(command)
+
+        for width, commands in outlines.items():
+            if len(commands) == len(outline_sides):
+                d = f"M0,0 V{_num(h)} H{_num(w)} V0 Z"
+            else:
+                d = " ".join(commands)
+            p = svg.path(d=d)
             p.fill(color="none")
-            p.stroke(color="black", width=self.outline.top)
-            p.push("M", 0, 0)
-            p.push("l", w, 0)
+            p.stroke(color="black", width=width)
             g.add(p)
 
         # Labels
-        g.add(_text(svg, w / 2, h, self.x_axis.label, "axis x-axis label"))
-        g.add(_text(svg, 0, h, self.x_axis.min_label, "axis x-axis range-min"))
-        g.add(_text(svg, w, h, self.x_axis.max_label, "axis x-axis range-max"))
+        labels = g.add(svg.g(class_="labels"))
+        labels.add(_text(svg, w / 2, h, self.x_axis.label, "axis x-axis label"))
+        labels.add(_text(svg, 0, h, self.x_axis.min_label, "axis x-axis range-min"))
+        labels.add(_text(svg, w, h, self.x_axis.max_label, "axis x-axis range-max"))
 
-        g.add(_text(svg, 0, h / 2, self.y_axis.label, class_="axis y-axis label"))
-        g.add(_text(svg, 0, 0, self.y_axis.max_label, "axis y-axis range-max"))
-        g.add(_text(svg, 0, h, self.y_axis.min_label, "axis y-axis range-min"))
+        labels.add(_text(svg, 0, h / 2, self.y_axis.label, class_="axis y-axis label"))
+        labels.add(_text(svg, 0, 0, self.y_axis.max_label, "axis y-axis range-max"))
+        labels.add(_text(svg, 0, h, self.y_axis.min_label, "axis y-axis range-min"))
 
         return drawing.data_url
 
@@ -288,37 +300,108 @@ class LineGraph(pydantic.BaseModel):
             table.add_column(self.y_axis.label)
 
         if self.show_on_console:
-            for n in range(len(series[0].data)):
-                row = [series[0].data[n][0]]
-
-                for s in series:
-                    row.append(s.data[n][1])
-
-                for n, v in enumerate(row):
-                    if n == 0:
-                        row[n] = rich.text.Text(f"{v:0.3f}", style="bold italic")
-                    elif isinstance(v, float):
-                        color = _color_for_value(v, self.y_axis.min, self.y_axis.max)
-                        row[n] = rich.text.Text(f"{v:0.3f}", style=color)
-                    else:
-                        row[n] = f"{v!r}"
-
-                table.add_row(*row)
+            fmt = "{:0.3f}".format
+            y_min, y_max = self.y_axis.min, self.y_axis.max
+
+            columns = [s.data for s in series]
+            styles = [
+                _colors_for_values([y for _, y in c], y_min, y_max) for c in columns
+            ]
+
+            # Walk the series in lockstep rather than indexing into each one
+            # per cell.
+            for points, row_styles in zip(zip(*columns), zip(*styles)):
+                table.add_row(
+                    rich.text.Text(fmt(points[0][0]), style="bold italic"),
+                    *(
+                        rich.text.Text(fmt(y), style=style)
+                        for (_, y), style in zip(points, row_styles)
+                    ),
+                )
         else:
             table.add_row("hidden on console")
 
         return rich.align.Align.center(table)
 
 
-def _color_for_value(val, min, max):
-    span = max - min
-    dist = (val - min) / span
+def _project_linear(xs, ys, x_min, x_span, y_min, y_span, w, h):
+    x_out = np.empty(xs.shape[0], dtype=np.float64)
+    y_out = np.empty(ys.shape[0], dtype=np.float64)
+
+    for i in range(xs.shape[0]):
+        x = (xs[i] - x_min) / x_span
+        y = (ys[i] - y_min) / y_span
+        x_out[i] = min(1.0, max(0.0, x)) * w
+        y_out[i] = h - min(1.0, max(0.0, y)) * h
+
+    return x_out, y_out
+
+
+_get_project_kernel = lazy_njit(_project_linear, cache=True, fastmath=True)
+
+
+def _project(data, x_axis, y_axis, w, h):
+    """Projects an (N, 2) array of datapoints onto a w by h canvas."""
+    kernel = None
+    if x_axis.ease is Ease.linear and y_axis.ease is Ease.linear:
+        kernel = _get_project_kernel()
+
+    if kernel is not None:
+        xs = np.ascontiguousarray(data[:, 0])
+        ys = np.ascontiguousarray(data[:, 1])
+        return kernel(xs, ys, x_axis.min, x_axis.span, y_axis.min, y_axis.span, w, h)
+
+    x_offsets = np.clip(x_axis.offsets_of(data[:, 0]), 0.0, 1.0) * w
+    y_offsets = h - np.clip(y_axis.offsets_of(data[:, 1]), 0.0, 1.0) * h
+    return x_offsets, y_offsets
+
+
+def _decimate(xs, ys):
+    """Reduces projected datapoints to the minimum and maximum point in each
+    whole-unit column, along with the series' endpoints, in their original
+    order.
+
+    Series with many more points than the graph is wide otherwise emit lots
+    of points that land on top of each other. Series that aren't sorted by x
+    or contain non-finite values are returned unchanged.
+    """
+    columns = xs.astype(np.intp)
+    changes = np.diff(columns)
+
+    if np.any(changes < 0) or not np.all(np.isfinite(ys)):
+        return xs, ys
+
+    starts = np.concatenate(([0], np.flatnonzero(changes) + 1))
+
+    if starts.size * 2 >= xs.size:
+        return xs, ys
+
+    counts = np.diff(np.append(starts, xs.size))
+    indexes = np.arange(xs.size)
+    y_min = np.repeat(np.minimum.reduceat(ys, starts), counts)
+    y_max = np.repeat(np.maximum.reduceat(ys, starts), counts)
+    min_at = np.minimum.reduceat(np.where(ys == y_min, indexes, xs.size), starts)
+    max_at = np.minimum.reduceat(np.where(ys == y_max, indexes, xs.size), starts)
+
+    keep = np.unique(np.concatenate(([0, xs.size - 1], min_at, max_at)))
+    return xs[keep], ys[keep]
+
+
+def _rgb_for_hue(hue):
+    r, g, b = colorsys.hsv_to_rgb(hue, 0.6, 1.0)
+    return f"rgb({int(r * 255)},{int(g * 255)},{int(b * 255)})"
+
 
-    if 0 <= dist <= 1:
-        hue = 0.6 - dist * 0.4
-    else:
-        hue = 0
+# Colors for values within the axis range, indexed by int(dist * 255).
+_COLOR_LUT = tuple(_rgb_for_hue(0.6 - (n / 255) * 0.4) for n in range(256))
+_OUT_OF_RANGE_COLOR = _rgb_for_hue(0)
 
-    rgbstr = ",".join([str(int(n * 255)) for n in colorsys.hsv_to_rgb(hue, 0.6, 1.0)])
 
-    return f"rgb({rgbstr})"
+def _colors_for_values(vals, min, max):
+    dist = (np.asarray(vals, dtype=np.float64) - min) / (max - min)
+    in_range = (dist >= 0) & (dist <= 1)
+    indexes = np.where(in_range, dist * 255, 0).astype(np.intp)
+    return [
+        _COLOR_LUT[i] if ok else _OUT_OF_RANGE_COLOR
+        for i, ok in zip(indexes.tolist(), in_range.tolist())
+    ]
@@ -3,11 +3,11 @@
 # Full text available at: https://opensource.org/licenses/MIT
 
 import base64
+import functools
 import importlib.resources
 import io
 import mimetypes
 import pathlib
-import tempfile
 
 import jinja2
 import qrcode
@@ -23,6 +23,7 @@ def _material_icon(name):
     return f'<span class="material-icons">{name}</span>'
 
 
+@functools.lru_cache(maxsize=128)
 def _make_qrcode(data):
     bio = io.BytesIO()
     qr = qrcode.QRCode()
@@ -43,15 +44,22 @@ def _file_to_data_url(filename):
     return f"data:{content_type};base64,{encoded}"
 
 
-template = jinja2.Template(
-    importlib.resources.read_text("wintertools.reportcard", "template.html")
-)
-template.globals["make_qrcode"] = _make_qrcode
-template.globals["material_icon"] = _material_icon
+@functools.lru_cache
+def _logo():
+    with importlib.resources.path("wintertools.reportcard", "logo.svg") as src:
+        return _file_to_data_url(src)
+
 
+_environment = jinja2.Environment(
+    loader=jinja2.PackageLoader("wintertools.reportcard", ""),
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+    auto_reload=False,
+)
+_environment.globals["make_qrcode"] = _make_qrcode
+_environment.globals["material_icon"] = _material_icon
+_environment.globals["logo"] = _logo
 
-with importlib.resources.path("wintertools.reportcard", "logo.svg") as src:
-    template.globals["logo"] = _file_to_data_url(src)
+template = _environment.get_template("template.html")
 
 
 def render_html(report, file=None):
@@ -62,9 +70,8 @@ def render_html(report, file=None):
         file.parent.mkdir(parents=True, exist_ok=True)
 
     if isinstance(file, (str, pathlib.Path)):
-        with open(file, "w") as fh:
-            fh.write(output)
-            rich.print(f"[green]Report rendered to {file}")
+        pathlib.Path(file).write_bytes(output.encode("utf-8"))
+        rich.print(f"[green]Report rendered to {file}")
     elif file:
         file.write(output)
 
@@ -77,9 +84,8 @@ def render_image(report, dest=None):
         dest = pathlib.Path(f"reports/{report.name.lower()}-{report.ulid}.png")
         dest.parent.mkdir(parents=True, exist_ok=True)
 
-    with tempfile.NamedTemporaryFile("w", suffix=".html") as html_fh:
-        render_html(report, file=html_fh)
-        puppeteer_screenshot.capture(f"file://{html_fh.name}", dest)
-        rich.print(f"[green]Report rendered to {dest}")
+    output = template.render(report=report)
+    puppeteer_screenshot.capture_html(output, dest)
+    rich.print(f"[green]Report rendered to {dest}")
 
     return dest
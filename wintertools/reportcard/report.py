@@ -2,14 +2,17 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
+import contextvars
 import datetime
+import functools
 import inspect
 import json
+import math
 import pathlib
 import textwrap
-import types
 from typing import Sequence, Union
 
+import orjson
 import pydantic
 import rich
 import rich.align
@@ -18,7 +21,6 @@ import rich.padding
 import rich.panel
 import rich.text
 import ulid
-import numpy as np
 
 from wintertools.waveform import Waveform
 from . import graph
@@ -43,15 +45,15 @@ PURPLES = (
     "#7D61BA",
     "#5E409E",
 )
-COLORS = np.array([TEALS, REDS, PURPLES]).T.flatten()
+COLORS = tuple(c for shades in zip(TEALS, REDS, PURPLES) for c in shades)
 DEFAULT_STROKES = (BLACKISH, TEALS[-1], REDS[-1], PURPLES[-1])
 
 
 def _json_encoder(val, default):
+    # Models are left to default, which is the model's pydantic encoder and
+    # so picks up _tag_class through Config.json_encoders.
     if isinstance(val, datetime.datetime):
         return dict(__datetime__=True, value=val.isoformat())
-    if isinstance(val, pydantic.BaseModel):
-        return val.dict()
     if inspect.isfunction(val):
         return dict(
             __function__=True,
@@ -63,66 +65,186 @@ def _json_encoder(val, default):
     # raise ValueError(f"{val!r} ({type(val)!r}) is not json encodeable.")
 
 
-def _json_decoder(val):
+@functools.lru_cache(maxsize=256)
+def _compile_function_source(source):
+    # Reports tend to repeat the same few functions, such as graph eases.
+    return compile(source, "", "exec")
+
+
+def _json_decoder(val, trusted=False):
+    # Tagged models are by far the most common marker in a report, so they're
+    # checked first. A tagged dict never carries the other markers.
+    type_ = val.get("__class__")
+    if type_ is not None:
+        if trusted:
+            cls = _TRUSTED_CLASS_MAP.get(type_)
+            if cls is not None:
+                return cls.construct(
+                    **{k: v for k, v in val.items() if k != "__class__"}
+                )
+
+        cls = _CLASS_MAP.get(type_)
+        if cls is not None:
+            return cls(**val)
+
+        return val
     if "__datetime__" in val:
         return datetime.datetime.fromisoformat(val["value"])
     if "__function__" in val:
-        module = types.ModuleType("__dynamic")
-        compiled = compile(val["source"], "", "exec")
-        exec(compiled, module.__dict__)
-        return module.__dict__[val["name"]]
-    if "__class__" in val:
-        type_ = val["__class__"]
-        if type_ == "TextItem":
-            return TextItem(**val)
-        if type_ == "SubTextItem":
-            return SubTextItem(**val)
-        if type_ == "LabelValueItem":
-            return LabelValueItem(**val)
-        if type_ == "PassFailItem":
-            return PassFailItem(**val)
-        if type_ == "ImageItem":
-            return ImageItem(**val)
-        if type_ == "LineGraphItem":
-            return LineGraphItem(**val)
+        namespace = {"__name__": "__dynamic"}
+        exec(_compile_function_source(val["source"]), namespace)
+        return namespace[val["name"]]
 
     return val
 
 
+# Datetimes are passed through to _json_encoder so they keep their
+# __datetime__ marker instead of becoming plain strings.
+_ORJSON_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+)
+
+
+def _has_non_finite(val):
+    # Walks the same containers that orjson would, without encoding anything.
+    stack = [val]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, float):
+            if not math.isfinite(node):
+                return True
+        elif isinstance(node, pydantic.BaseModel):
+            stack.extend(node.__dict__.values())
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+
+    return False
+
+
+def _json_dumpb(val, *, default):
+    def encoder(v):
+        return _json_encoder(v, default)
+
+    out = orjson.dumps(val, default=encoder, option=_ORJSON_OPTIONS)
+
+    # orjson writes NaN and infinity as null, which won't load back into a
+    # float field. The stdlib encoder keeps them, so use it for the rare
+    # report that has any.
+    if b"null" in out and _has_non_finite(val):
+        text = json.dumps(val, default=encoder, indent=2, ensure_ascii=False)
+        return text.encode("utf-8")
+
+    return out
+
+
 def _json_dumps(val, *, default):
-    return json.dumps(val, default=lambda v: _json_encoder(v, default), indent=2)
+    return _json_dumpb(val, default=default).decode("utf-8")
+
+
+def _json_decode_tree(val, trusted=False):
+    # Applies _json_decoder bottom-up, the same way json.loads' object_hook
+    # would. Containers are collected parents-first with an explicit stack
+    # and then rewritten in reverse, so children are always decoded before
+    # the dicts that hold them. Plain values are never touched.
+    root = [val]
+    containers = []
+    stack = [(val, root, 0)]
+    while stack:
+        node, parent, key = stack.pop()
+        containers.append((node, parent, key))
+        children = node.items() if isinstance(node, dict) else enumerate(node)
+        for k, v in children:
+            if isinstance(v, (dict, list)):
+                stack.append((v, node, k))
+
+    for node, parent, key in reversed(containers):
+        if isinstance(node, dict):
+            parent[key] = _json_decoder(node, trusted)
+
+    return root[0]
+
+
+def _json_loads(val, trusted=False):
+    try:
+        tree = orjson.loads(val)
+    except orjson.JSONDecodeError:
+        # Reports with NaN or infinity are written by the stdlib encoder, see
+        # _json_dumpb.
+        tree = json.loads(val)
+
+    return _json_decode_tree(tree, trusted)
+
 
+def _cache_rich(func):
+    """Reuses the renderable built by __rich__ until the model is changed."""
 
-def _json_loads(val):
-    return json.loads(val, object_hook=_json_decoder)
+    @functools.wraps(func)
+    def wrapper(self):
+        if self._rich_cache is None:
+            self._rich_cache = func(self)
+        return self._rich_cache
+
+    return wrapper
+
+
+# Set while pydantic's own json() builds its output from dict(), so models
+# are tagged there too.
+_tag_dicts = contextvars.ContextVar("_tag_dicts", default=False)
+
+
+def _tag_class(model):
+    # Nested models are left as they are, the encoder is called again for
+    # each of them.
+    return {"__class__": type(model).__name__, **model.__dict__}
 
 
 class _BaseModel(pydantic.BaseModel):
-    """Extended to return the class name when serializing"""
+    """Extended to include the class name when serializing"""
 
     class Config:
         json_loads = _json_loads
         json_dumps = _json_dumps
+        # Filled in below, _BaseModel doesn't exist yet.
+        json_encoders = {}
 
-    def _iter(
-        self,
-        to_dict: bool = False,
-        by_alias: bool = False,
-        include=None,
-        exclude=None,
-        exclude_unset: bool = False,
-        exclude_defaults: bool = False,
-        exclude_none: bool = False,
-    ):
-        yield "__class__", self.__class__.__name__
-        for k, v in super()._iter():
-            yield k, v
+    def json(self, **kwargs):
+        # pydantic's json() encodes the output of dict(), which isn't tagged,
+        # so encode the model itself instead.
+        if not any(kwargs.values()):
+            return self.__config__.json_dumps(self, default=self.__json_encoder__)
+
+        # Options like include, exclude and by_alias are applied by dict(),
+        # so go through pydantic but have it tag each model along the way.
+        token = _tag_dicts.set(True)
+        try:
+            return super().json(**kwargs)
+        finally:
+            _tag_dicts.reset(token)
+
+    def _iter(self, *args, **kwargs):
+        if _tag_dicts.get():
+            yield "__class__", type(self).__name__
+        yield from super()._iter(*args, **kwargs)
+
+
+# pydantic binds this exact dict into _BaseModel's encoder, and subclasses copy
+# it when they're created.
+_BaseModel.__config__.json_encoders[_BaseModel] = _tag_class
 
 
 class Item(_BaseModel):
     type: str = "unknown"
     class_: str = ""
 
+    _rich_cache: object = pydantic.PrivateAttr(default=None)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name not in self.__private_attributes__:
+            self._rich_cache = None
+
     @property
     def succeeded(self):
         return True
@@ -135,6 +257,7 @@ class TextItem(Item):
     type: str = "text"
     text: str
 
+    @_cache_rich
     def __rich__(self):
         return rich.text.Text(self.text)
 
@@ -144,6 +267,7 @@ class SubTextItem(Item):
     text: str
     class_: str = "font-weight-normal"
 
+    @_cache_rich
     def __rich__(self):
         return rich.text.Text(self.text, style="italic")
 
@@ -153,6 +277,7 @@ class LabelValueItem(Item):
     label: str
     value: str
 
+    @_cache_rich
     def __rich__(self):
         return rich.console.Group(
             rich.text.Text(f"{self.label}: ", style="italic", end=""),
@@ -177,6 +302,7 @@ class PassFailItem(Item):
         else:
             return "error_outline"
 
+    @_cache_rich
     def __rich__(self):
         style = "green" if self.value else "bold red"
         character = "✓" if self.value else "❌"
@@ -232,6 +358,20 @@ class LineGraphItem(Item):
         return self.graph.draw_console(series=self.series)
 
 
+# Item classes that _json_decoder rebuilds from their __class__ marker.
+_CLASS_MAP = {
+    cls.__name__: cls
+    for cls in (
+        TextItem,
+        SubTextItem,
+        LabelValueItem,
+        PassFailItem,
+        ImageItem,
+        LineGraphItem,
+    )
+}
+
+
 class Section(_BaseModel):
     name: str
     items: list[Item] = []
@@ -245,10 +385,7 @@ class Section(_BaseModel):
 
     @property
     def succeeded(self):
-        for i in self.items:
-            if not i.succeeded:
-                return False
-        return True
+        return all(i.succeeded for i in self.items)
 
     def __rich__(self):
         return rich.console.Group(
@@ -260,6 +397,21 @@ class Section(_BaseModel):
         )
 
 
+# Classes that only hold plain values or already decoded items, so they can
+# skip validation when loading a trusted report.
+_TRUSTED_CLASS_MAP = {
+    cls.__name__: cls
+    for cls in (
+        TextItem,
+        SubTextItem,
+        LabelValueItem,
+        PassFailItem,
+        ImageItem,
+        Section,
+    )
+}
+
+
 class Report(_BaseModel):
     name: str
     ulid: str = pydantic.Field(default_factory=lambda: str(ulid.ULID()))
@@ -280,10 +432,7 @@ class Report(_BaseModel):
 
     @property
     def succeeded(self):
-        for s in self.sections:
-            if not s.succeeded:
-                return False
-        return True
+        return all(s.succeeded for s in self.sections)
 
     def save(self, file=None):
         if file is None:
@@ -291,23 +440,43 @@ class Report(_BaseModel):
             file.parent.mkdir(parents=True, exist_ok=True)
 
         if isinstance(file, (str, pathlib.Path)):
-            with open(file, "w") as fh:
-                fh.write(self.json())
+            # Write the encoded bytes directly instead of decoding them into
+            # an intermediate str, reports with graphs can be quite large.
+            with open(file, "wb") as fh:
+                fh.write(_json_dumpb(self, default=self.__json_encoder__))
             rich.print(f"[green]Report saved to {file}")
             return pathlib.Path(file)
         elif file:
-            file.write(self.json())
+            file.write(_json_dumps(self, default=self.__json_encoder__))
 
     @classmethod
-    def load(self, file):
+    def load(cls, file, *, trusted=False):
+        """Loads a report saved with save().
+
+        If trusted is True, the report is assumed to have been written by
+        save() and most of it is rebuilt without running pydantic's
+        validation, which is considerably faster for large reports.
+        """
         if isinstance(file, (str, pathlib.Path)):
-            with open(file, "r") as fh:
-                return self.parse_raw(fh.read())
+            # save() writes UTF-8 bytes, which shouldn't be decoded with the
+            # locale's encoding.
+            with open(file, "rb") as fh:
+                raw = fh.read()
         elif file:
-            return self.parse_raw(file.read())
+            raw = file.read()
+        else:
+            return None
+
+        if not trusted:
+            return cls.parse_raw(raw)
+
+        fields = _json_loads(raw, trusted=True)
+        fields.pop("__class__", None)
+        return cls.construct(**fields)
 
     def __rich__(self):
-        name_color = "green" if self.succeeded else "red"
+        succeeded = self.succeeded
+        name_color = "green" if succeeded else "red"
 
         renderables = [
             rich.padding.Padding(
@@ -318,7 +487,7 @@ class Report(_BaseModel):
             *self.sections,
         ]
 
-        if self.succeeded:
+        if succeeded:
             renderables.append(
                 rich.align.Align.center(
                     rich.padding.Padding(
@@ -4,10 +4,33 @@
 
 """Thin wrappers over subprocess"""
 
+import concurrent.futures
+import functools
+import os
+import shutil
 import subprocess
 
 
+@functools.lru_cache(maxsize=64)
+def _which(program, path):
+    # path is part of the cache key so that changes to PATH are picked up.
+    return shutil.which(program, path=path) or program
+
+
 def run(*args, capture=True):
+    # subprocess only uses posix_spawn() instead of fork() + exec() when the
+    # program is given as a path and close_fds is off. Python's own file
+    # descriptors are non-inheritable, so leaving close_fds off is safe.
+    if args and not os.path.dirname(args[0]):
+        args = (_which(args[0], os.environ.get("PATH")), *args[1:])
+
     return subprocess.run(
-        args, capture_output=capture, encoding="utf-8", check=True
+        args, capture_output=capture, encoding="utf-8", check=True, close_fds=False
     ).stdout
+
+
+def run_many(cmds, *, workers=8, capture=True):
+    """Runs independent commands in parallel, returning their outputs in
+    order."""
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(lambda cmd: run(*cmd, capture=capture), cmds))
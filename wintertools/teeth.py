@@ -49,66 +49,46 @@ def teeth_encoded_length(src_len: int) -> int:
     return ((src_len + 4 - 1) // 4) * 5
 
 
+# Per-byte lookup tables for bytes.translate(): the lower 7 bits of each byte
+# and its most significant bit.
+_LOW_BITS = bytes(b & 0x7F for b in range(256))
+_HIGH_BIT = bytes(b >> 7 for b in range(256))
+
+
 def teeth_encode(src: bytearray) -> bytearray:
     """Teeth encodes the given bytearray.
 
     The resulting bytearray will be :func:`teeth_encoded_length()` bytes long.
     """
+    src = bytes(src)
     src_len = len(src)
     dst_len = teeth_encoded_length(src_len)
     dst = bytearray(dst_len)
-    src_idx = 0
-    dst_idx = 0
 
-    while src_idx < src_len:
-        # There's 4 or more bytes left
-        if src_idx + 4 <= src_len:
-            # First byte carries the leftover bits.
-            dst[dst_idx] = (
-                0x40
-                | ((src[src_idx] & 0x80) >> 4)
-                | ((src[src_idx + 1] & 0x80) >> 5)
-                | ((src[src_idx + 2] & 0x80) >> 6)
-                | ((src[src_idx + 3] & 0x80) >> 7)
-            )
-            # Subsequent bytes carry their lower 7 bits.
-            dst[dst_idx + 1] = src[src_idx] & 0x7F
-            dst[dst_idx + 2] = src[src_idx + 1] & 0x7F
-            dst[dst_idx + 3] = src[src_idx + 2] & 0x7F
-            dst[dst_idx + 4] = src[src_idx + 3] & 0x7F
-            dst_idx += 5
-            src_idx += 4
-        # There's only 3 bytes left
-        elif src_idx + 3 == src_len:
-            dst[dst_idx] = (
-                0x30
-                | ((src[src_idx] & 0x80) >> 4)
-                | ((src[src_idx + 1] & 0x80) >> 5)
-                | ((src[src_idx + 2] & 0x80) >> 6)
-            )
-            dst[dst_idx + 1] = src[src_idx] & 0x7F
-            dst[dst_idx + 2] = src[src_idx + 1] & 0x7F
-            dst[dst_idx + 3] = src[src_idx + 2] & 0x7F
-            dst_idx += 4
-            src_idx += 3
-        # There's only 2 bytes left
-        elif src_idx + 2 == src_len:
-            dst[dst_idx] = (
-                0x20 | ((src[src_idx] & 0x80) >> 4) | ((src[src_idx + 1] & 0x80) >> 5)
-            )
-            dst[dst_idx + 1] = src[src_idx] & 0x7F
-            dst[dst_idx + 2] = src[src_idx + 1] & 0x7F
-            dst_idx += 3
-            src_idx += 2
-        # There's only 1 byte left
-        elif src_idx + 1 == src_len:
-            dst[dst_idx] = 0x10 | ((src[src_idx] & 0x80) >> 4)
-            dst[dst_idx + 1] = src[src_idx] & 0x7F
-            dst_idx += 2
-            src_idx += 1
-        else:
-            print("Hmm", src_idx, src_len)
-            break
+    low_bits = src.translate(_LOW_BITS)
+    high_bits = src.translate(_HIGH_BIT)
+
+    # Full groups of 4 bytes are encoded with slice assignments, each of the
+    # strided slices holds one byte position of every group.
+    groups = src_len // 4
+    full_len = groups * 5
+    dst[0:full_len:5] = bytes(
+        0x40 | a << 3 | b << 2 | c << 1 | d
+        for a, b, c, d in zip(
+            high_bits[0::4], high_bits[1::4], high_bits[2::4], high_bits[3::4]
+        )
+    )
+    for n in range(4):
+        dst[n + 1 : full_len : 5] = low_bits[n : groups * 4 : 4]
+
+    # The last group may have fewer than 4 bytes, its header holds the count.
+    remaining = src_len - groups * 4
+    if remaining:
+        header = remaining << 4
+        for n, bit in enumerate(high_bits[groups * 4 :]):
+            header |= bit << (3 - n)
+        dst[full_len] = header
+        dst[full_len + 1 : full_len + 1 + remaining] = low_bits[groups * 4 :]
 
     return dst
 
@@ -5,19 +5,26 @@
 """Utilities for Terminal UIs."""
 
 import atexit
+import functools
 import io
 import math
+import os
 import shutil
 import sys
 
 from wcwidth import wcswidth
 
+# UI strings tend to repeat from one redraw to the next.
+_wcswidth = functools.lru_cache(maxsize=2048)(wcswidth)
+_SPACES = tuple(" " * n for n in range(256))
+
 
 def pad(spec, string):
     justify, count = spec[0], int(spec[1:])
 
-    width = wcswidth(string) if string else 0
-    spaces = " " * max(0, count - width)
+    width = _wcswidth(string) if string else 0
+    space_count = max(0, count - width)
+    spaces = _SPACES[space_count] if space_count < 256 else " " * space_count
 
     if justify == "<":
         return f"{string}{spaces}"
@@ -33,14 +40,14 @@ class Escape:
     ERASE_LINE = f"{CSI}2K\r"
     MOVE_UP = f"{CSI}1A"
     CURSOR_PREVIOUS_LINE = f"{CSI}1F"
-    CURSOR_PREVIOUS_LINE_NUM = f"{CSI}{{count}}F"
+    CURSOR_PREVIOUS_LINE_NUM = f"{CSI}%dF"
     ERASE_AFTER_CURSOR = f"{CSI}0J"
     HIDE_CURSOR = f"{CSI}?25l"
     SHOW_CURSOR = f"{CSI}?25h"
 
     RESET = f"{CSI}0m"
-    COLOR24FG = f"{CSI}38;2;{{r}};{{g}};{{b}}m"
-    COLOR24BG = f"{CSI}48;2;{{r}};{{g}};{{b}}m"
+    COLOR24FG = f"{CSI}38;2;%d;%d;%dm"
+    COLOR24BG = f"{CSI}48;2;%d;%d;%dm"
     BOLD = f"{CSI}1m"
     FAINT = f"{CSI}2m"
     ITALIC = f"{CSI}3m"
@@ -73,11 +80,25 @@ def gradient(a, b, v):
 
 
 def gradient_text(string, start, end):
-    result = ""
+    ar, ag, ab = _normalize_color(start)
+    br, bg, bb = _normalize_color(end)
+    dr, dg, db = br - ar, bg - ag, bb - ab
+    template = Escape.COLOR24FG + "%s"
+    count = len(string)
+
+    result = []
     for n, c in enumerate(string):
-        color = gradient(start, end, n / len(string))
-        result += rgb(color) + c
-    return result
+        v = n / count
+        result.append(
+            template
+            % (
+                (ar + v * dr) * 255,
+                (ag + v * dg) * 255,
+                (ab + v * db) * 255,
+                c,
+            )
+        )
+    return "".join(result)
 
 
 class Colors:
@@ -86,12 +107,8 @@ class Colors:
     @staticmethod
     def rgb(r, g=None, b=None, fg=True):
         r, g, b = _normalize_color(r, g, b)
-        r, g, b = [int(x * 255) for x in (r, g, b)]
-
-        if fg:
-            return Escape.COLOR24FG.format(r=r, g=g, b=b)
-        else:
-            return Escape.COLOR24BG.format(r=r, g=g, b=b)
+        template = Escape.COLOR24FG if fg else Escape.COLOR24BG
+        return template % (r * 255, g * 255, b * 255)
 
 
 _stdout_stack = []
@@ -105,30 +122,58 @@ class Updateable:
         self._clear_all = clear_all
         self._persist = persist
 
+        # Updates are written straight to the file descriptor when there is
+        # one, so each update is a single write() call.
+        try:
+            self._fd = sys.__stdout__.fileno()
+        except (AttributeError, OSError, ValueError):
+            self._fd = None
+
     def write(self, text):
         self._buf.write(text)
 
     def reset(self):
         self._line_count = 0
 
-    def _erase(self, line_count):
+    def _clear_lines(self, line_count):
         if line_count == 0:
-            return
+            return ""
 
-        clear_lines = Escape.CURSOR_PREVIOUS_LINE_NUM.format(count=line_count)
+        clear_lines = Escape.CURSOR_PREVIOUS_LINE_NUM % line_count
         if self._clear_all:
             clear_lines += Escape.ERASE_AFTER_CURSOR
-        clear_lines += "\r"
-        sys.__stdout__.write(clear_lines)
+        return clear_lines + "\r"
 
-    def update(self):
-        self._erase(self._line_count)
-        self._line_count = 0
+    def _write(self, text):
+        if self._fd is None:
+            sys.__stdout__.write(text)
+            sys.__stdout__.flush()
+            return
 
-        output = self._buf.getvalue()
-        sys.__stdout__.write(output)
+        # Anything already buffered by sys.__stdout__ has to go out first.
+        # Encode the same way it would, so that bytes written either way
+        # agree.
         sys.__stdout__.flush()
-        self._buf.truncate(0)
+        data = memoryview(
+            text.encode(sys.__stdout__.encoding, errors=sys.__stdout__.errors)
+        )
+        while data:
+            data = data[os.write(self._fd, data) :]
+
+    def _erase(self, line_count):
+        if line_count == 0:
+            return
+
+        self._write(self._clear_lines(line_count))
+
+    def _reset_buf(self):
+        self._buf.seek(0)
+        self._buf.truncate()
+
+    def update(self):
+        output = self._buf.getvalue()
+        self._write(self._clear_lines(self._line_count) + output)
+        self._reset_buf()
         self._line_count = output.count("\n")
 
     def __enter__(self, stdout=True):
@@ -147,14 +192,12 @@ class Updateable:
         sys.__stdout__.write(Escape.SHOW_CURSOR)
 
         if self._persist:
-            output = self._buf.getvalue()
-            sys.__stdout__.write(output)
-            sys.__stdout__.flush()
+            self._write(self._buf.getvalue())
         else:
             self._erase(self._line_count)
             self._line_count = 0
 
-        self._buf.truncate(0)
+        self._reset_buf()
 
         if sys.stdout == self._buf:
             sys.stdout = _stdout_stack.pop()
@@ -181,40 +224,70 @@ class Bar:
     def __init__(self, width=50, fill=True):
         self.width = width
         self.fill = fill
+        self._widths = None
+
+    def set_segments(self, widths, colors, chars=None):
+        """Stores segments on the bar so that draw() can be called without
+        any. The color escapes are built once here, and widths can be
+        changed afterwards with set_width()."""
+        self._widths = [float(width) for width in widths]
+        self._escapes = [Colors.rgb(*color) for color in colors]
+        if chars is None:
+            chars = [Segment.FILL_CHAR] * len(self._widths)
+        self._chars = list(chars)
+
+    def set_width(self, index, width):
+        self._widths[index] = width
 
     def draw(self, *segments, end="\n", file=None):
         if file is None:
             file = sys.stdout
 
-        segments = list(segments)
-
-        for n, segment in enumerate(segments):
-            if isinstance(segment, tuple):
-                segments[n] = Segment(*segment)
+        if segments or self._widths is None:
+            segments = [
+                Segment(*segment) if isinstance(segment, tuple) else segment
+                for segment in segments
+            ]
+            widths = [s.width for s in segments]
+            escapes = [Colors.rgb(*s.color) for s in segments]
+            chars = [s.char for s in segments]
+        else:
+            widths, escapes, chars = self._widths, self._escapes, self._chars
 
         # Add end segment if needed.
         if self.fill:
-            left_to_fill = 1.0 - sum(s.width for s in segments)
-            segments.append(
-                Segment(left_to_fill, color=self.FILL_COLOR, char=self.FILL_CHAR)
-            )
+            widths = widths + [1.0 - sum(widths)]
+            escapes = escapes + [Colors.rgb(*self.FILL_COLOR)]
+            chars = chars + [self.FILL_CHAR]
 
         # Largest remainder method allocation
-        seg_lengths = [math.floor(s.width * self.width) for s in segments]
-        seg_fract = [(n, (s.width * self.width) % 1.0) for n, s in enumerate(segments)]
-        seg_fract.sort(key=lambda x: x[1], reverse=True)
+        scaled = [w * self.width for w in widths]
+        seg_lengths = [math.floor(s) for s in scaled]
         remainder = self.width - sum(seg_lengths)
 
-        for n in range(remainder):
-            seg_lengths[seg_fract[n][0]] += 1
+        if remainder > 0:
+            # The sort is stable, so ties go to the earliest segments. Bars
+            # that aren't filled can come up short, but no segment gets more
+            # than one extra character.
+            by_fraction = sorted(
+                range(len(scaled)),
+                key=lambda n: scaled[n] - seg_lengths[n],
+                reverse=True,
+            )
+            for n in by_fraction[:remainder]:
+                seg_lengths[n] += 1
 
         # Now draw
-        buf = ""
-        for n, seg in enumerate(segments):
-            buf += Colors.rgb(*seg.color) + (seg.char * seg_lengths[n])
-        buf += Colors.reset + end
-
-        file.write(buf)
+        file.write(
+            "".join(
+                [
+                    escape + (char * length)
+                    for escape, char, length in zip(escapes, chars, seg_lengths)
+                ]
+            )
+            + Colors.reset
+            + end
+        )
 
 
 class Columns:
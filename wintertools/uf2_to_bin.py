@@ -31,12 +31,12 @@ def with_file(file, dest=None):
 def with_buf(buf):
     numblocks = len(buf) // 512
     curraddr = None
-    output = b""
+    view = memoryview(buf)
+    output = bytearray()
 
     for blockno in range(numblocks):
         ptr = blockno * 512
-        block = buf[ptr : ptr + 512]
-        header = struct.unpack("<IIIIIIII", block[0:32])
+        header = struct.unpack_from("<IIIIIIII", buf, ptr)
 
         if header[0] != UF2_MAGIC_START0 or header[1] != UF2_MAGIC_START1:
             print(f"Skipping block at {ptr}; bad magic")
@@ -60,12 +60,9 @@ def with_buf(buf):
         assert padding < 10 * 1024 * 1024, f"More than 10M of padding needed at {ptr}"
         assert padding % 4 == 0, f"Non-word padding size at {ptr}"
 
-        while padding > 0:
-            padding -= 4
-            output += b"\x00\x00\x00\x00"
-
-        output += block[32 : 32 + datalen]
+        output.extend(bytes(padding))
+        output.extend(view[ptr + 32 : ptr + 32 + datalen])
 
         curraddr = newaddr + datalen
 
-    return output
+    return bytes(output)
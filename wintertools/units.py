@@ -6,20 +6,28 @@
 Helpers for formatting units
 """
 
+import bisect
 import math
 
 
+def _split_formats(formats):
+    # Splits a formats table into its sorted limits, for bisect, and the
+    # matching (mult, fullname, shortname) entries.
+    return [f[0] for f in formats], [tuple(f[1:]) for f in formats]
+
+
 def _format_unit(
     value, *, formats, use_fullname=False, use_space=True, precision=2
 ) -> str:
     space = " " if use_space else ""
     name = ""
 
-    for [max, mult, fullname, shortname] in formats:
-        if abs(value) < max:
-            value *= mult
-            name = fullname if use_fullname else shortname
-            break
+    limits, entries = formats
+    index = bisect.bisect_right(limits, abs(value))
+    if index < len(entries):
+        mult, fullname, shortname = entries[index]
+        value *= mult
+        name = fullname if use_fullname else shortname
 
     return f"{value:.{precision}f}{space}{name}"
 
@@ -31,10 +39,11 @@ _SECONDS_FORMATS = [
     [3600, 1, "seconds", "s"],
     [math.inf, 1 / 60, "hours", "h"],
 ]
+_SECONDS = _split_formats(_SECONDS_FORMATS)
 
 
 def format_seconds(seconds, **kwargs):
-    return _format_unit(seconds, formats=_SECONDS_FORMATS, **kwargs)
+    return _format_unit(seconds, formats=_SECONDS, **kwargs)
 
 
 _HERTZ_FORMATS = [
@@ -47,10 +56,11 @@ _HERTZ_FORMATS = [
     [1000000000000, 1 / 1000000000, "gigahertz", "GHz"],
     [math.inf, 1 / 1000000000000, "terahertz", "THz"],
 ]
+_HERTZ = _split_formats(_HERTZ_FORMATS)
 
 
 def format_hertz(hertz, **kwargs):
-    return _format_unit(hertz, formats=_HERTZ_FORMATS, **kwargs)
+    return _format_unit(hertz, formats=_HERTZ, **kwargs)
 
 
 _VOLTS_FORMATS = [
@@ -59,7 +69,8 @@ _VOLTS_FORMATS = [
     [1, 1000, "millivolts", "mV"],
     [math.inf, 1, "volts", "V"],
 ]
+_VOLTS = _split_formats(_VOLTS_FORMATS)
 
 
 def format_volts(volts, **kwargs):
-    return _format_unit(volts, formats=_VOLTS_FORMATS, **kwargs)
+    return _format_unit(volts, formats=_VOLTS, **kwargs)
@@ -2,7 +2,8 @@
 # Published under the standard MIT License.
 # Full text available at: https://opensource.org/licenses/MIT
 
-import pyvisa
+# pyvisa is imported where it's used, it's slow to import and most of
+# wintertools doesn't need it.
 
 from . import config
 
@@ -13,6 +14,8 @@ def global_resource_manager():
     global _resource_manager
 
     if _resource_manager is None:
+        import pyvisa
+
         _resource_manager = pyvisa.ResourceManager(
             config.get("visa.interface", default="@py")
         )
@@ -28,6 +31,7 @@ class Instrument:
         self.connect(resource_manager, resource_name)
 
     def connect(self, resource_manager, resource_name):
+        import pyvisa
 
         if resource_manager is None:
             resource_manager = global_resource_manager()
@@ -17,7 +17,9 @@ from typing import IO, Any, BinaryIO, Generator, TextIO
 
 import numpy as np
 from numpy.typing import NDArray
-from PIL import Image, ImageDraw, ImageChops
+from PIL import Image, ImageDraw
+
+from .jit import lazy_njit
 
 
 @dataclasses.dataclass(kw_only=True, slots=True, frozen=True)
@@ -32,52 +34,87 @@ class Waveform:
     sample_rate: float
     sample_step: int
     frequency: float
-    data: NDArray[np.float64]
+    # Kept as separate contiguous arrays rather than as the columns of a
+    # single (N, 2) array, so reductions over either one are unit-stride.
+    time: NDArray[np.float64]
+    voltage: NDArray[np.float64]
+    # (time min, time max, voltage min, voltage max), filled in by _get_stats().
+    # The class is slotted so cached_property can't be used.
+    _stats: tuple | None = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # rfft of voltage, filled in by _get_spectrum(). One reference is usually
+    # compared against many waveforms, so it's kept with the waveform rather
+    # than with each WaveformSimilarity.
+    _spectrum: NDArray[np.complex128] | None = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def _get_stats(self):
+        if self._stats is None:
+            object.__setattr__(
+                self,
+                "_stats",
+                (
+                    self.time.min(),
+                    self.time.max(),
+                    self.voltage.min(),
+                    self.voltage.max(),
+                ),
+            )
+        return self._stats
+
+    def _get_spectrum(self):
+        if self._spectrum is None:
+            object.__setattr__(self, "_spectrum", np.fft.rfft(self.voltage))
+        return self._spectrum
+
+    @property
+    def data(self):
+        """The samples as an (N, 2) array of time and voltage."""
+        return np.column_stack((self.time, self.voltage))
 
     @property
     def time_data(self):
-        return self.data[:, 0]
+        return self.time
 
     @property
     def voltage_data(self):
-        return self.data[:, 1]
+        return self.voltage
 
     @property
     def num_samples(self):
-        return self.data.shape[0]
+        return self.voltage.shape[0]
 
     @property
     def start_time(self):
-        return self.time_data.min()
+        return self._get_stats()[0]
 
     @property
     def end_time(self):
-        return self.time_data.max()
+        return self._get_stats()[1]
 
     @property
     def time_span(self):
-        return self.time_data.max() - self.time_data.min()
+        start, end, _, _ = self._get_stats()
+        return end - start
 
     @property
     def min_voltage(self):
-        return self.voltage_data.min()
+        return self._get_stats()[2]
 
     @property
     def max_voltage(self):
-        return self.voltage_data.max()
+        return self._get_stats()[3]
 
     @property
     def voltage_span(self):
-        return self.voltage_data.max() - self.voltage_data.min()
+        _, _, low, high = self._get_stats()
+        return high - low
 
     def to_list(self, samples=None):
         if samples is not None:
-            data = np.column_stack(
-                (
-                    _resample(self.data[:, 0], samples),
-                    _resample(self.data[:, 1], samples),
-                )
-            )
+            data = _resample_columns((self.time, self.voltage), samples)
         else:
             data = self.data
 
@@ -90,19 +127,21 @@ class Waveform:
         if h <= 0:
             h = self.vertical_resolution * 2
 
-        im = Image.new("1", (w, h), color=0)
-        draw = ImageDraw.Draw(im)
-
         lines = _map_series_to_image_coords(
-            series=self.data[:, 1],
+            series=self.voltage,
             src_min=self.vertical_min,
             src_max=self.vertical_max,
             dst_width=w,
             dst_height=h,
         )
 
+        im = Image.new("1", (w, h), color=0)
+        draw = ImageDraw.Draw(im)
+
+        # Pillow reads a float32 buffer directly, without building a Python
+        # object per coordinate.
         draw.line(
-            lines.flatten().tolist(),
+            lines.astype(np.float32).ravel(),
             fill=1,
             width=thickness,
             joint="curve",
@@ -114,18 +153,20 @@ class Waveform:
         result = {}
 
         for f in dataclasses.fields(self):
-            value = getattr(self, f.name)
+            if not f.init or f.name in ("time", "voltage"):
+                continue
+            result[f.name] = getattr(self, f.name)
 
-            if isinstance(value, np.ndarray):
-                value = value.tolist()
-
-            result[f.name] = value
+        # Samples are still saved as a single list of [time, voltage] pairs.
+        result["data"] = self.data.tolist()
 
         return result
 
     @classmethod
     def from_dict(cls, data):
-        data["data"] = np.array(data["data"], dtype=np.float64)
+        samples = np.array(data.pop("data"), dtype=np.float64).reshape(-1, 2)
+        data["time"] = np.ascontiguousarray(samples[:, 0])
+        data["voltage"] = np.ascontiguousarray(samples[:, 1])
         return cls(**data)
 
     def save(self, dst: str | PathLike | TextIO):
@@ -138,6 +179,24 @@ class Waveform:
             data = json.load(fh)
         return cls.from_dict(data)
 
+    def save_npz(self, dst: str | PathLike | BinaryIO):
+        """Saves to a compressed numpy archive, keeping the samples as raw
+        float64 arrays instead of a list of Python floats."""
+        fields = {
+            f.name: getattr(self, f.name) for f in dataclasses.fields(self) if f.init
+        }
+        with open_or_io(dst, "wb") as fh:
+            np.savez_compressed(fh, **fields)
+
+    @classmethod
+    def load_npz(cls, dst: str | PathLike | BinaryIO):
+        with open_or_io(dst, "rb") as fh, np.load(fh) as archive:
+            data = {
+                name: value if value.ndim else value.item()
+                for name, value in archive.items()
+            }
+        return cls(**data)
+
 
 @contextmanager
 def open_or_io(
@@ -158,25 +217,80 @@ class WaveformSimilarity:
         self.reference = reference
         self.other = other
 
+    # For equal length signals the correlations below are a single value,
+    # computed as a dot product. Captures can differ in length though, and
+    # those go through np.correlate as before.
+
+    @functools.cached_property
+    def _ref_v(self):
+        return np.ascontiguousarray(self.reference.voltage_data)
+
+    @functools.cached_property
+    def _other_v(self):
+        return np.ascontiguousarray(self.other.voltage_data)
+
+    # The signals are real, so only the non-negative half of their spectra is
+    # computed. The other half is its mirrored conjugate, so inner products
+    # over the full spectrum are the real part of a weighted inner product
+    # over this half: every bin counts twice, except for DC and (for even
+    # lengths) Nyquist which have no mirror.
+
+    @functools.cached_property
+    def _ref_fft(self):
+        return self.reference._get_spectrum()
+
+    @functools.cached_property
+    def _other_fft(self):
+        return self.other._get_spectrum()
+
+    @functools.cached_property
+    def _fft_weights(self):
+        weights = np.full(self._ref_fft.shape[0], 2.0)
+        weights[0] = 1.0
+        if self._ref_v.shape[0] % 2 == 0:
+            weights[-1] = 1.0
+        return weights
+
+    def _spectral_inner(self, a, b):
+        return np.vdot(b * self._fft_weights, a).real
+
+    @functools.cached_property
+    def _ref_autocorr_time(self):
+        return self._ref_v @ self._ref_v
+
+    @functools.cached_property
+    def _ref_autocorr_freq(self):
+        return self._spectral_inner(self._ref_fft, self._ref_fft)
+
+    @functools.cached_property
+    def _same_length(self):
+        return self._ref_v.shape[0] == self._other_v.shape[0]
+
     @functools.cached_property
     def time(self):
-        ref_time = np.correlate(
-            self.reference.voltage_data, self.reference.voltage_data
-        )
-        inp_time = np.correlate(self.reference.voltage_data, self.other.voltage_data)
-        return abs(ref_time - inp_time)[0]
+        if not self._same_length:
+            ref_time = np.correlate(self._ref_v, self._ref_v)
+            inp_time = np.correlate(self._ref_v, self._other_v)
+            return abs(ref_time - inp_time)[0]
+
+        inp_time = self._ref_v @ self._other_v
+        return abs(self._ref_autocorr_time - inp_time)
 
     @functools.cached_property
     def frequency(self):
-        ref_fft = np.fft.fft(self.reference.voltage_data)
-        ref_freq = np.correlate(ref_fft, ref_fft)
-        inp_freq = np.correlate(ref_fft, np.fft.fft(self.other.voltage_data))
-        return abs(ref_freq - inp_freq)[0]
+        if not self._same_length:
+            ref_fft = np.fft.fft(self._ref_v)
+            ref_freq = np.correlate(ref_fft, ref_fft)
+            inp_freq = np.correlate(ref_fft, np.fft.fft(self._other_v))
+            return abs(ref_freq - inp_freq)[0]
+
+        inp_freq = self._spectral_inner(self._ref_fft, self._other_fft)
+        return abs(self._ref_autocorr_freq - inp_freq)
 
     @functools.cached_property
     def power(self):
-        ref_power = np.sum(self.reference.voltage_data**2)
-        inp_power = np.sum(self.other.voltage_data**2)
+        ref_power = np.sum(self._ref_v**2)
+        inp_power = np.sum(self._other_v**2)
         return abs(ref_power - inp_power)
 
 
@@ -191,18 +305,42 @@ class WaveformPassFail:
     ):
         self.resolution = resolution
         self.reference_image = None
+        # (reference image, its pixels as a bool array), so compare() only
+        # converts the reference again after it's replaced.
+        self._reference_mask = (None, None)
 
     def add_reference(self, reference, *, tolerance=0.1):
-        ref_img = reference.to_binary_image(
-            size=self.resolution,
-            thickness=math.ceil(reference.num_samples * tolerance),
-        )
+        self.add_references([reference], tolerance=tolerance)
+
+    def add_references(self, references, *, tolerance=0.1):
+        """Adds several references at once, combining their masks as arrays
+        and only building the reference image once at the end."""
+        mask = None
+        if self.reference_image:
+            mask = np.array(self.reference_image, dtype=np.bool_)
+
+        for reference in references:
+            ref_img = reference.to_binary_image(
+                size=self.resolution,
+                thickness=math.ceil(reference.num_samples * tolerance),
+            )
 
-        if not self.reference_image:
-            self.reference_image = ref_img
-            self.resolution = self.reference_image.size
-        else:
-            self.reference_image = ImageChops.logical_or(self.reference_image, ref_img)
+            if mask is None:
+                mask = np.array(ref_img, dtype=np.bool_)
+                self.resolution = ref_img.size
+            else:
+                np.logical_or(mask, np.asarray(ref_img), out=mask)
+
+        if mask is not None:
+            self.reference_image = Image.fromarray(mask)
+            self._reference_mask = (self.reference_image, mask)
+
+    def _get_reference_mask(self):
+        image, mask = self._reference_mask
+        if image is not self.reference_image:
+            mask = np.asarray(self.reference_image, dtype=np.bool_)
+            self._reference_mask = (self.reference_image, mask)
+        return mask
 
     def compare(self, wf: Waveform):
         measured = wf.to_binary_image(
@@ -210,7 +348,10 @@ class WaveformPassFail:
             thickness=1,
         )
 
-        outside = ImageChops.subtract(measured, self.reference_image)
+        # Pixels lit in the measurement but not in the reference.
+        outside = Image.fromarray(
+            np.asarray(measured, dtype=np.bool_) & ~self._get_reference_mask()
+        )
 
         return WaveformPassFailResult(
             reference_image=self.reference_image,
@@ -277,10 +418,118 @@ class WaveformPassFailResult:
         return self.fail_count / self.samples.size
 
 
-def _resample(src: np.ndarray, num_samples: int):
-    new_x = np.linspace(0, src.size - 1, num_samples)
-    resampled = np.interp(new_x, np.arange(src.size), src)
-    return resampled
+def _resample_linear(columns, num_samples):
+    # The sample positions are shared by every column, so each one is
+    # computed once.
+    num_columns = len(columns)
+    out = np.empty((num_samples, num_columns), dtype=np.float64)
+    last = columns[0].shape[0] - 1
+    step = last / (num_samples - 1) if num_samples > 1 else 0.0
+
+    for i in range(num_samples):
+        pos = i * step
+        lo = int(pos)
+        if lo >= last:
+            for c in range(num_columns):
+                out[i, c] = columns[c][last]
+        else:
+            frac = pos - lo
+            for c in range(num_columns):
+                out[i, c] = columns[c][lo] * (1.0 - frac) + columns[c][lo + 1] * frac
+
+    return out
+
+
+_get_resample_kernel = lazy_njit(_resample_linear, cache=True, fastmath=True)
+
+
+def _resample_columns(columns, num_samples: int):
+    """Linearly resamples equal length columns to num_samples rows, returning
+    a (num_samples, len(columns)) array."""
+    columns = tuple(np.ascontiguousarray(c, dtype=np.float64) for c in columns)
+
+    kernel = _get_resample_kernel()
+    if kernel is not None:
+        return kernel(columns, num_samples)
+
+    last = columns[0].size - 1
+    positions = np.linspace(0, last, num_samples)
+    lo = positions.astype(np.intp)
+    hi = np.minimum(lo + 1, last)
+    frac = positions - lo
+
+    out = np.empty((num_samples, len(columns)), dtype=np.float64)
+    for n, column in enumerate(columns):
+        out[:, n] = column[lo] * (1.0 - frac) + column[hi] * frac
+    return out
+
+
+def _map_series_kernel(series, src_min, src_max, dst_width, dst_height):
+    # Same mapping as the np.interp version below, fused into two loops over
+    # preallocated arrays. Both source grids are linspaces, so the bracketing
+    # interval is found arithmetically and then nudged so that the grid
+    # points and the interpolation match np.interp exactly.
+    num_samples = series.shape[0]
+    out = np.empty((dst_width, 2), dtype=np.int32)
+    y_coords = np.empty(num_samples, dtype=np.float64)
+
+    y_last = dst_height - 1
+    y_step = (src_max - src_min) / y_last
+    for i in range(num_samples):
+        v = series[i]
+        if v <= src_min:
+            pos = 0.0
+        elif v >= src_max or y_step == 0.0:
+            pos = float(y_last)
+        else:
+            j = min(int((v - src_min) / y_step), y_last - 1)
+            while j > 0 and j * y_step + src_min > v:
+                j -= 1
+            while (
+                j < y_last - 1
+                and ((j + 1) * y_step + src_min if j + 1 < y_last else src_max) <= v
+            ):
+                j += 1
+            lo = j * y_step + src_min
+            hi = (j + 1) * y_step + src_min if j + 1 < y_last else src_max
+            if lo == v:
+                pos = float(j)
+            else:
+                pos = 1.0 / (hi - lo) * (v - lo) + j
+        y_coords[i] = y_last - int(pos)
+
+    x_last = num_samples - 1
+    x_step = dst_width / x_last if x_last > 0 else 0.0
+    for x in range(dst_width):
+        if x_last == 0:
+            y = y_coords[0]
+        else:
+            j = min(int(x / x_step), x_last - 1)
+            while j > 0 and j * x_step > x:
+                j -= 1
+            while j < x_last - 1 and (j + 1) * x_step <= x:
+                j += 1
+            lo = j * x_step
+            hi = (j + 1) * x_step if j + 1 < x_last else float(dst_width)
+            if lo == x:
+                y = y_coords[j]
+            else:
+                slope = (y_coords[j + 1] - y_coords[j]) / (hi - lo)
+                y = slope * (x - lo) + y_coords[j]
+        out[x, 0] = x
+        out[x, 1] = int(y)
+
+    return out
+
+
+# No fastmath, the truncation to pixel rows is sensitive to rounding. The
+# wrapper below always passes these types, so the signature means a single
+# compilation.
+_get_map_series_kernel = lazy_njit(
+    _map_series_kernel,
+    "int32[:, ::1](float64[::1], float64, float64, int64, int64)",
+    cache=True,
+)
 
 
 def _map_series_to_image_coords(
@@ -291,13 +540,25 @@ def _map_series_to_image_coords(
     dst_width: int,
     dst_height: int,
 ):
-    # There has to be a better way to do this, but I'm too dumb to figure it out
-    y_src_space = np.linspace(src_min, src_max, dst_height)
-    y_dst_space = np.arange(dst_height)
+    kernel = _get_map_series_kernel()
+    if kernel is not None:
+        return kernel(
+            np.ascontiguousarray(series, dtype=np.float64),
+            float(src_min),
+            float(src_max),
+            int(dst_width),
+            int(dst_height),
+        )
 
-    y_coords = np.array(dst_height) - np.interp(
-        series, y_src_space, y_dst_space
-    ).astype(int)
+    # Row 0 is the top of the image, so src_max maps to 0 and src_min to the
+    # last row. Rows are kept as floats: floor() matches truncating to int
+    # since they're never negative, and converting the whole series to ints
+    # is much slower.
+    y_coords = (dst_height - 1) - np.floor(
+        np.interp(
+            series, np.linspace(src_min, src_max, dst_height), np.arange(dst_height)
+        )
+    )
 
     x_src_space = np.linspace(0, dst_width, series.shape[0])
     x_dst_space = np.arange(dst_width)